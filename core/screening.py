@@ -1,4 +1,5 @@
-from pymatgen.core.surface import get_symmetrically_distinct_miller_indices
+from collections import OrderedDict
+
 from core.slab_generator import oriented_slab_replication
 
 
@@ -24,12 +25,17 @@ class SurfaceScreener:
         Returns:
             list of dicts with screening results for each slab/termination
         """
+        from pymatgen.core.surface import get_symmetrically_distinct_miller_indices
+
         miller_indices = get_symmetrically_distinct_miller_indices(
             self.structure, self.max_index
         )
         total = len(miller_indices)
         results = []
         failures = []
+        # Shared across Miller indices so the bulk's symmetry analysis
+        # inside SlabGenerator runs once rather than per surface.
+        orient_cache = OrderedDict()
 
         for idx, (h, k, l) in enumerate(miller_indices):
             if progress_callback:
@@ -37,20 +43,21 @@ class SurfaceScreener:
 
             try:
                 slabs = oriented_slab_replication(
-                    structure=self.structure.copy(),
+                    structure=self.structure,
                     h=h, k=k, l=l,
                     z_reps=self.z_reps,
                     min_vac=self.vacuum,
                     center_slab=self.center_slab,
                     all_terminations=True,
                     force_ortho=self.force_ortho,
+                    orient_cache=orient_cache,
                 )
             except Exception as e:
                 failures.append({"miller": (h, k, l), "error": str(e)})
                 continue
 
             for slab in slabs:
-                shift_val = getattr(slab, "shift", 0.0)
+                shift_val = round(getattr(slab, "shift", 0.0), 4)
                 try:
                     is_sym = slab.is_symmetric()
                 except Exception:
@@ -59,12 +66,14 @@ class SurfaceScreener:
                 results.append({
                     "miller": (h, k, l),
                     "miller_str": f"({h},{k},{l})",
-                    "shift": round(shift_val, 4),
+                    "shift": shift_val,
                     "num_atoms": len(slab),
                     "surface_area": round(slab.surface_area, 2),
                     "is_symmetric": is_sym,
                     "formula": slab.composition.reduced_formula,
                     "slab": slab,
+                    # Export filename without extension, dots made filename-safe
+                    "fname_stem": f"POSCAR_{h}{k}{l}_shift{shift_val}".replace(".", "-"),
                 })
 
         if progress_callback:
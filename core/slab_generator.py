@@ -1,12 +1,30 @@
+from collections import OrderedDict
+
 import numpy as np
 from pymatgen.core import Structure
-from pymatgen.core.surface import SlabGenerator
-from pymatgen.analysis.structure_matcher import StructureMatcher
+
+# Maximum number of generation results kept in a slab_cache (FIFO)
+SLAB_CACHE_SIZE = 8
+
+# Maximum number of entries kept in an orient_cache (LRU). Each (h,k,l)
+# adds an oriented cell and shares one tagged bulk, so this holds about
+# as many orientations as a slab_cache holds results.
+ORIENT_CACHE_SIZE = 2 * SLAB_CACHE_SIZE
+
+
+def _structure_key(structure):
+    """Hashable fingerprint of a structure's lattice, species and sites."""
+    return (
+        structure.lattice.matrix.tobytes(),
+        structure.frac_coords.tobytes(),
+        tuple(str(sp) for sp in structure.species),
+    )
 
 
 def oriented_slab_replication(
     structure, h, k, l, z_reps, min_vac, center_slab,
-    all_terminations, force_ortho
+    all_terminations, force_ortho, orient_cache=None, slab_cache=None,
+    progress_callback=None
 ):
     """
     Two-stage slab generation:
@@ -16,20 +34,77 @@ def oriented_slab_replication(
        to produce vacuum and terminations.
     4) If force_ortho, apply get_orthogonal_c_slab().
 
+    `structure` is never mutated, so callers may pass a shared reference.
+
+    orient_cache: optional OrderedDict reused across calls to memoize step 1,
+    so sweeping z_reps/vacuum at fixed (h,k,l) skips the orientation. It also
+    keeps the symmetry-tagged bulk, so a new (h,k,l) on the same bulk skips
+    SlabGenerator's spacegroup analysis. Holds up to ORIENT_CACHE_SIZE
+    entries, least recently used first out.
+
+    slab_cache: optional dict memoizing the slabs from steps 1-3 per bulk and
+    generation parameters (up to SLAB_CACHE_SIZE entries), so toggling only
+    force_ortho, or regenerating unchanged inputs, skips SlabGenerator.
+    Callers always receive fresh copies.
+
+    progress_callback: callable(current, total) invoked as each of the
+    three stages (orient, terminations, orthogonalize) completes.
+
     Returns a list of Slab objects.
     """
+    slab_key = None
+    if slab_cache is not None:
+        slab_key = (_structure_key(structure), h, k, l, z_reps, min_vac,
+                    center_slab, all_terminations)
+        cached = slab_cache.get(slab_key)
+        if cached is not None:
+            slabs = [s.copy() for s in cached]
+            if progress_callback:
+                progress_callback(2, 3)
+            return _finish_slabs(slabs, force_ortho, progress_callback)
+
+    # Imported here: pymatgen.core.surface is slow to load at GUI startup
+    from pymatgen.core.surface import SlabGenerator
+
     # Step 1: orient along (h,k,l)
-    orient_gen = SlabGenerator(
-        initial_structure=structure.copy(),
-        miller_index=(h, k, l),
-        min_slab_size=1.0,
-        min_vacuum_size=0.0,
-        center_slab=False
-    )
-    oriented_slab = orient_gen.get_slab()
+    cache_key = bulk_key = None
+    oriented = tagged_bulk = None
+    if orient_cache is not None:
+        structure_key = _structure_key(structure)
+        cache_key = (structure_key, h, k, l)
+        bulk_key = (structure_key, "bulk")
+        oriented = orient_cache.get(cache_key)
+        tagged_bulk = orient_cache.get(bulk_key)
+        for key, value in ((cache_key, oriented), (bulk_key, tagged_bulk)):
+            if value is not None:
+                orient_cache.move_to_end(key)
+    if oriented is None:
+        # Copy-on-write: SlabGenerator tags its input with
+        # bulk_wyckoff/bulk_equivalent site properties (running a
+        # spacegroup analysis), so copy only when no tagged bulk is cached.
+        orient_gen = SlabGenerator(
+            initial_structure=(tagged_bulk if tagged_bulk is not None
+                               else structure.copy()),
+            miller_index=(h, k, l),
+            min_slab_size=1.0,
+            min_vacuum_size=0.0,
+            center_slab=False
+        )
+        oriented = orient_gen.get_slab()
+        if orient_cache is not None:
+            orient_cache[cache_key] = oriented
+            orient_cache[bulk_key] = orient_gen.parent
+            orient_cache.move_to_end(bulk_key)
+            while len(orient_cache) > ORIENT_CACHE_SIZE:
+                orient_cache.popitem(last=False)
+    # Steps 2-3 modify the oriented slab, so never touch the cached one
+    oriented_slab = oriented.copy() if orient_cache is not None else oriented
+    if progress_callback:
+        progress_callback(1, 3)
 
-    # Step 2: replicate in z
-    oriented_slab.make_supercell([1, 1, z_reps])
+    # Step 2: replicate in z (a 1x1x1 supercell would only rebuild the sites)
+    if z_reps > 1:
+        oriented_slab.make_supercell([1, 1, z_reps])
 
     # Step 3: add vacuum and terminations via (0,0,1) slab
     final_gen = SlabGenerator(
@@ -44,40 +119,119 @@ def oriented_slab_replication(
         slabs = final_gen.get_slabs(symmetrize=False)
     else:
         slabs = [final_gen.get_slab()]
+    if slab_cache is not None:
+        slab_cache[slab_key] = [s.copy() for s in slabs]
+        if len(slab_cache) > SLAB_CACHE_SIZE:
+            del slab_cache[next(iter(slab_cache))]
+    if progress_callback:
+        progress_callback(2, 3)
+
+    return _finish_slabs(slabs, force_ortho, progress_callback)
 
-    # Step 4: orthogonalize if requested
+
+def _finish_slabs(slabs, force_ortho, progress_callback):
+    """Step 4 of oriented_slab_replication: orthogonalize if requested."""
     if force_ortho:
         slabs = [s.get_orthogonal_c_slab() for s in slabs]
-
+    if progress_callback:
+        progress_callback(3, 3)
     return slabs
 
 
-def cut_out_z_region(structure, zmin, zmax):
-    """Return new Structure with sites having z in [zmin, zmax] (Cartesian)."""
-    new_sites = [site for site in structure if zmin <= site.coords[2] <= zmax]
-    if not new_sites:
+def cut_out_z_region(structure, zmin, zmax, cart_coords=None,
+                     frac_coords=None):
+    """
+    Return new Structure with sites having z in [zmin, zmax] (Cartesian).
+
+    cart_coords/frac_coords may be passed when slicing the same structure
+    repeatedly, so the arrays are not rebuilt from the sites on each call.
+    """
+    if cart_coords is None:
+        cart_coords = structure.cart_coords
+    if frac_coords is None:
+        frac_coords = structure.frac_coords
+    cart_z = cart_coords[:, 2]
+    idx = np.flatnonzero((cart_z >= zmin) & (cart_z <= zmax))
+    if idx.size == 0:
         return None
-    new_struct = Structure(lattice=structure.lattice, species=[], coords=[])
-    for s in new_sites:
-        new_struct.append(
-            s.species, s.coords, coords_are_cartesian=True,
-            properties=s.properties if s.properties else None,
-        )
-    return new_struct
+    # Build from the already-fractional coords in one constructor call
+    # instead of appending Cartesian sites one by one.
+    site_props = {
+        key: [values[i] for i in idx]
+        for key, values in structure.site_properties.items()
+    }
+    return Structure(
+        lattice=structure.lattice,
+        species=[structure[i].species for i in idx],
+        coords=frac_coords[idx],
+        site_properties=site_props or None,
+    )
+
+
+def _apply_rotation(structure, rotation_matrix):
+    """Return a new Structure with all Cartesian site coords rotated."""
+    new_coords = structure.cart_coords @ np.asarray(rotation_matrix).T
+    return Structure(
+        lattice=structure.lattice,
+        species=[site.species for site in structure],
+        coords=new_coords,
+        coords_are_cartesian=True,
+    )
 
 
 def rotate_bottom_180(structure):
     """Rotate structure 180 deg around y-axis (flip upside down)."""
-    rotation_matrix = np.array([
-        [-1.0, 0.0, 0.0],
-        [0.0, 1.0, 0.0],
-        [0.0, 0.0, -1.0]
-    ])
-    new_struct = Structure(lattice=structure.lattice, species=[], coords=[])
-    for site in structure:
-        new_coords = rotation_matrix.dot(site.coords)
-        new_struct.append(site.species, new_coords, coords_are_cartesian=True)
-    return new_struct
+    return _apply_rotation(structure, np.diag([-1.0, 1.0, -1.0]))
+
+
+def _z_profiles_differ(top_struct, bottom_struct, stol, ltol):
+    """
+    Cheap necessary condition for a StructureMatcher match.
+
+    Matched sites lie within stol * (V/N)^(1/3) of each other, so the
+    sorted z-profiles (or the mirrored one, as a lattice mapping may flip
+    c) must agree to that tolerance up to a rigid shift. Only applied when
+    both regions share a slab lattice with a, b in-plane, c clearly the
+    longest axis and enough vacuum that no match can wrap through c.
+    """
+    lattice = top_struct.lattice
+    matrix = lattice.matrix
+    if not np.allclose(matrix, bottom_struct.lattice.matrix):
+        return False
+    c_z = abs(matrix[2, 2])
+    if (abs(matrix[0, 2]) > 1e-6 or abs(matrix[1, 2]) > 1e-6
+            or max(lattice.abc[:2]) * (1 + ltol) >= c_z):
+        return False
+
+    tol = stol * (lattice.volume / len(top_struct)) ** (1 / 3)
+    za = np.sort(top_struct.cart_coords[:, 2])
+    zb = np.sort(bottom_struct.cart_coords[:, 2])
+    extent = max(za[-1] - za[0], zb[-1] - zb[0])
+    if 2 * (extent + tol) >= c_z:
+        return False
+
+    # Best rigid shift leaves half the spread of the pairwise differences
+    for diff in (za - zb, za + zb[::-1]):
+        if (diff.max() - diff.min()) / 2 <= tol:
+            return False
+    return True
+
+
+_MATCHER = None
+
+
+def _get_matcher():
+    """Build the surface StructureMatcher once per process and reuse it."""
+    global _MATCHER
+    if _MATCHER is None:
+        from pymatgen.analysis.structure_matcher import StructureMatcher
+        _MATCHER = StructureMatcher(
+            stol=0.5,
+            angle_tol=5,
+            primitive_cell=False,
+            attempt_supercell=False
+        )
+    return _MATCHER
 
 
 def compare_structures(top_struct, bottom_struct):
@@ -87,27 +241,106 @@ def compare_structures(top_struct, bottom_struct):
     """
     if top_struct is None or bottom_struct is None:
         return (False, None)
-    matcher = StructureMatcher(
-        stol=0.5,
-        angle_tol=5,
-        primitive_cell=False,
-        attempt_supercell=False
-    )
-    is_match = matcher.fit(top_struct, bottom_struct)
-    if is_match:
-        rmsd, max_dist = matcher.get_rms_dist(top_struct, bottom_struct)
-        return (True, rmsd)
-    return (False, None)
+    # Cheap invariants first: regions with different site counts or
+    # compositions can never match, so skip the StructureMatcher.
+    if len(top_struct) != len(bottom_struct):
+        return (False, None)
+    if (top_struct.composition.reduced_formula
+            != bottom_struct.composition.reduced_formula):
+        return (False, None)
+    matcher = _get_matcher()
+    if _z_profiles_differ(top_struct, bottom_struct,
+                          matcher.stol, matcher.ltol):
+        return (False, None)
+    # fit() decides the match: it accepts if any lattice mapping is within
+    # stol, while get_rms_dist only reports the lowest-RMS mapping, whose
+    # max_dist can exceed stol. So the RMS is computed for matches only.
+    if not matcher.fit(top_struct, bottom_struct):
+        return (False, None)
+    res = matcher.get_rms_dist(top_struct, bottom_struct)
+    return (True, res[0] if res is not None else None)
+
+
+def slab_z_bounds(slab, cart_coords=None):
+    """
+    Return (z_min, z_max) of the slab's Cartesian z-coordinates.
+
+    The result is cached on the slab so the info panel and the export
+    path share a single pass over the sites.
+    """
+    bounds = getattr(slab, "_zminmax", None)
+    if bounds is None:
+        if cart_coords is None:
+            cart_coords = slab.cart_coords
+        z = cart_coords[:, 2]
+        bounds = (float(z.min()), float(z.max()))
+        slab._zminmax = bounds
+    return bounds
 
 
 def extract_surface_regions(slab, compare_depth):
     """
     Extract top and bottom surface regions from a slab.
     Returns (top_struct, bottom_rotated) where bottom is rotated 180 deg.
+
+    The result is cached on the slab per compare_depth, so exporting the
+    cleaves reuses the regions cut for the surface comparison.
     """
-    all_z = [site.coords[2] for site in slab]
-    z_min, z_max = min(all_z), max(all_z)
-    top_struct = cut_out_z_region(slab, z_max - compare_depth, z_max)
-    bottom_struct = cut_out_z_region(slab, z_min, z_min + compare_depth)
+    cached = getattr(slab, "_surface_regions", None)
+    if cached is not None and cached[0] == compare_depth:
+        return cached[1], cached[2]
+    # Build the coordinate arrays once for the bounds and both slices
+    cart_coords = slab.cart_coords
+    frac_coords = slab.frac_coords
+    z_min, z_max = slab_z_bounds(slab, cart_coords)
+    top_struct = cut_out_z_region(slab, z_max - compare_depth, z_max,
+                                  cart_coords, frac_coords)
+    bottom_struct = cut_out_z_region(slab, z_min, z_min + compare_depth,
+                                     cart_coords, frac_coords)
     bottom_rot = rotate_bottom_180(bottom_struct) if bottom_struct else None
+    slab._surface_regions = (compare_depth, top_struct, bottom_rot)
     return top_struct, bottom_rot
+
+
+def clear_slab_caches(slab):
+    """Drop the z bounds and surface regions cached on a slab after mutating it."""
+    for attr in ("_zminmax", "_surface_regions"):
+        slab.__dict__.pop(attr, None)
+
+
+def _region_species_differ(slab, compare_depth):
+    """
+    True if the top and bottom regions hold different sets of elements.
+
+    Works on the coordinate and atomic-number arrays, so slabs that can
+    never match skip building the region Structures entirely.
+    """
+    if not slab.is_ordered:
+        return False
+    cart_coords = slab.cart_coords
+    cart_z = cart_coords[:, 2]
+    z_min, z_max = slab_z_bounds(slab, cart_coords)
+    numbers = np.asarray(slab.atomic_numbers)
+    top = numbers[cart_z >= z_max - compare_depth]
+    bottom = numbers[cart_z <= z_min + compare_depth]
+    return top.size != bottom.size or not np.array_equal(np.sort(top),
+                                                         np.sort(bottom))
+
+
+def compare_slab_surfaces(slabs, compare_depth):
+    """
+    Compare top vs bottom surface regions for every slab.
+
+    Runs inline: for the handful of slabs one generation yields, process
+    start-up and pickling would cost more than the comparisons themselves.
+
+    Returns a list of (is_match, rmsd) tuples in slab order.
+    """
+    results = []
+    for slab in slabs:
+        if _region_species_differ(slab, compare_depth):
+            results.append((False, None))
+            continue
+        top_struct, bottom_rot = extract_surface_regions(slab, compare_depth)
+        results.append(compare_structures(top_struct, bottom_rot))
+    return results
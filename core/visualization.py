@@ -80,24 +80,25 @@ def plot_structure_3d(ax, structure, show_box=True, show_labels=True):
                 ha="center", va="center", fontsize=12, color="gray")
         return
 
-    # Collect per-atom data for a single scatter call (correct depth sorting)
-    all_coords = []
-    all_colors = []
-    all_sizes = []
-    seen_elements = {}  # symbol -> (color, radius) for legend
-
-    for site in structure:
-        symbol = site.specie.symbol if hasattr(site.specie, "symbol") else str(site.specie)
-        color = get_element_color(site.specie)
-        radius = get_element_radius(site.specie)
-        all_coords.append(site.coords)
-        all_colors.append(color)
-        all_sizes.append((radius / DEFAULT_RADIUS) ** 2 * 300)
+    # Collect per-atom data for a single scatter call (correct depth sorting).
+    # Color and size are looked up once per species, not once per site.
+    species = [site.specie for site in structure]
+    styles = {}         # specie -> (color, marker size)
+    seen_elements = {}  # symbol -> color for legend
+
+    for specie in species:
+        if specie in styles:
+            continue
+        symbol = specie.symbol if hasattr(specie, "symbol") else str(specie)
+        color = get_element_color(specie)
+        radius = get_element_radius(specie)
+        styles[specie] = (color, (radius / DEFAULT_RADIUS) ** 2 * 300)
         if symbol not in seen_elements:
             seen_elements[symbol] = color
 
-    all_coords = np.array(all_coords)
-    all_sizes = np.array(all_sizes)
+    all_coords = structure.cart_coords
+    all_colors = [styles[sp][0] for sp in species]
+    all_sizes = np.array([styles[sp][1] for sp in species])
 
     # Draw unit cell bounding box
     if show_box:
@@ -126,7 +127,6 @@ def plot_structure_3d(ax, structure, show_box=True, show_labels=True):
     ax.legend(loc="upper left", fontsize=8, framealpha=0.7)
 
     # Equal aspect ratio approximation
-    all_coords = np.array([site.coords for site in structure])
     _set_equal_aspect(ax, all_coords)
 
 
@@ -0,0 +1,56 @@
+"""Regression tests for the top/bottom surface comparison."""
+import os
+from collections import OrderedDict
+
+import pytest
+from pymatgen.core import Structure
+
+from core.slab_generator import (
+    _get_matcher,
+    compare_structures,
+    extract_surface_regions,
+    oriented_slab_replication,
+)
+
+SAMPLE_CIF = os.path.join(
+    os.path.dirname(__file__), os.pardir, "sample", "ICSD_CollCode166363.cif")
+
+
+@pytest.fixture(scope="module")
+def bulk():
+    return Structure.from_file(SAMPLE_CIF)
+
+
+@pytest.fixture(scope="module")
+def orient_cache():
+    return OrderedDict()
+
+
+# Orientations of the MoO3 sample where the lowest-RMS mapping exceeds stol
+# although fit() finds another mapping within it.
+@pytest.mark.parametrize("hkl, z_reps", [
+    ((1, 1, 0), 1),
+    ((2, 1, 0), 1),
+    ((1, 0, 1), 1),
+    ((1, 0, 1), 2),
+    ((2, 0, 1), 1),
+    ((2, 0, 1), 2),
+])
+@pytest.mark.parametrize("compare_depth", [2.0, 3.0])
+def test_compare_structures_agrees_with_fit(bulk, orient_cache, hkl, z_reps,
+                                            compare_depth):
+    matcher = _get_matcher()
+    slabs = oriented_slab_replication(
+        bulk, *hkl, z_reps, min_vac=10.0, center_slab=True,
+        all_terminations=True, force_ortho=False, orient_cache=orient_cache)
+    assert slabs
+    for slab in slabs:
+        top, bottom_rot = extract_surface_regions(slab, compare_depth)
+        is_match, rmsd = compare_structures(top, bottom_rot)
+        expected = (top is not None and bottom_rot is not None
+                    and matcher.fit(top, bottom_rot))
+        assert is_match == expected
+        if is_match:
+            assert rmsd == pytest.approx(matcher.get_rms_dist(top, bottom_rot)[0])
+        else:
+            assert rmsd is None
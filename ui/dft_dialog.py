@@ -1,12 +1,27 @@
 import os
+from collections import OrderedDict
+
+import numpy as np
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QSpinBox, QDoubleSpinBox, QCheckBox, QComboBox,
-    QPushButton, QTextEdit, QGroupBox, QFileDialog, QMessageBox,
+    QPushButton, QPlainTextEdit, QGroupBox, QFileDialog, QMessageBox,
     QTabWidget, QWidget,
 )
 
 from core.dft_inputs import DFTInputGenerator
+from core.slab_generator import clear_slab_caches
+
+# INCAR values for each entry of the ISIF / ISMEAR combo boxes, by index
+ISIF_VALUES = (2, 3)
+ISMEAR_VALUES = (0, 1, -5)
+
+# Delay after the last settings change before the INCAR/KPOINTS preview updates
+PREVIEW_DELAY_MS = 150
+
+# Rendered previews kept per dialog, keyed by tab and settings (LRU)
+PREVIEW_CACHE_SIZE = 64
 
 
 class DFTInputDialog(QDialog):
@@ -20,6 +35,12 @@ class DFTInputDialog(QDialog):
         self.suggested_dir_name = suggested_dir_name
         self.generator = DFTInputGenerator(slab)
 
+        # Coalesce bursts of spin-box edits into one preview refresh
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._refresh_preview)
+
         layout = QVBoxLayout()
         self.setLayout(layout)
 
@@ -115,27 +136,31 @@ class DFTInputDialog(QDialog):
         layout.addWidget(settings_group)
 
         # ── Preview Tabs (UX #14: INCAR + KPOINTS) ──
-        preview_tabs = QTabWidget()
+        self.preview_tabs = QTabWidget()
 
         incar_tab = QWidget()
         incar_layout = QVBoxLayout()
-        self.incar_preview = QTextEdit()
+        self.incar_preview = QPlainTextEdit()
         self.incar_preview.setReadOnly(True)
         self.incar_preview.setStyleSheet("font-family: Consolas, monospace; font-size: 11px;")
         incar_layout.addWidget(self.incar_preview)
         incar_tab.setLayout(incar_layout)
-        preview_tabs.addTab(incar_tab, "INCAR Preview")
+        self.preview_tabs.addTab(incar_tab, "INCAR Preview")
 
         kpoints_tab = QWidget()
         kpoints_layout = QVBoxLayout()
-        self.kpoints_preview = QTextEdit()
+        self.kpoints_preview = QPlainTextEdit()
         self.kpoints_preview.setReadOnly(True)
         self.kpoints_preview.setStyleSheet("font-family: Consolas, monospace; font-size: 11px;")
         kpoints_layout.addWidget(self.kpoints_preview)
         kpoints_tab.setLayout(kpoints_layout)
-        preview_tabs.addTab(kpoints_tab, "KPOINTS Preview")
+        self.preview_tabs.addTab(kpoints_tab, "KPOINTS Preview")
 
-        layout.addWidget(preview_tabs)
+        layout.addWidget(self.preview_tabs)
+        # Only the visible tab is rendered; the other catches up when shown
+        self._stale_previews = set()
+        self._preview_cache = OrderedDict()
+        self.preview_tabs.currentChanged.connect(self._render_preview)
 
         # ── Action Buttons ──
         action_layout = QHBoxLayout()
@@ -150,18 +175,29 @@ class DFTInputDialog(QDialog):
 
         layout.addLayout(action_layout)
 
-        # Initial preview
-        self._update_preview()
+        # Typed values only emit valueChanged once editing finishes
+        self._spins = (self.encut_spin, self.kproduct_spin, self.sigma_spin,
+                       self.ediffg_spin, self.freeze_threshold_spin)
+        for spin in self._spins:
+            spin.setKeyboardTracking(False)
+
+        # The initial preview is rendered after the first show (see showEvent)
+        self._first_shown = False
+
+    def showEvent(self, event):
+        """Paint the dialog first, then fill the preview on the next event loop pass."""
+        super().showEvent(event)
+        if not self._first_shown:
+            self._first_shown = True
+            QTimer.singleShot(0, self._refresh_preview)
 
     def _get_config(self):
         """Build config dict from current UI state."""
-        isif_map = {0: 2, 1: 3}
-        ismear_map = {0: 0, 1: 1, 2: -5}
         return {
             "encut": self.encut_spin.value(),
             "k_product": self.kproduct_spin.value(),
-            "isif": isif_map.get(self.isif_combo.currentIndex(), 2),
-            "ismear": ismear_map.get(self.ismear_combo.currentIndex(), 0),
+            "isif": ISIF_VALUES[self.isif_combo.currentIndex()],
+            "ismear": ISMEAR_VALUES[self.ismear_combo.currentIndex()],
             "sigma": self.sigma_spin.value(),
             "ediffg": self.ediffg_spin.value(),
             "auto_dipole": self.dipole_check.isChecked(),
@@ -169,9 +205,32 @@ class DFTInputDialog(QDialog):
         }
 
     def _update_preview(self):
+        """Schedule a preview refresh; restarts the timer on each change."""
+        self._preview_timer.start()
+
+    def _refresh_preview(self):
+        self._stale_previews = {0, 1}
+        self._render_preview(self.preview_tabs.currentIndex())
+
+    def _render_preview(self, index):
+        """Regenerate one preview tab (0 = INCAR, 1 = KPOINTS) if it is stale."""
+        if index not in self._stale_previews:
+            return
+        self._stale_previews.discard(index)
         config = self._get_config()
-        self.incar_preview.setPlainText(self.generator.get_incar_preview(config))
-        self.kpoints_preview.setPlainText(self.generator.get_kpoints_string(config))
+        key = (index, tuple(sorted(config.items())))
+        text = self._preview_cache.get(key)
+        if text is None:
+            if index == 0:
+                text = self.generator.get_incar_preview(config)
+            else:
+                text = self.generator.get_kpoints_string(config)
+            self._preview_cache[key] = text
+            if len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+        else:
+            self._preview_cache.move_to_end(key)
+        (self.incar_preview if index == 0 else self.kpoints_preview).setPlainText(text)
 
     def _apply_selective_dynamics(self):
         """Apply selective dynamics to the slab before generation (Feature #17)."""
@@ -179,16 +238,19 @@ class DFTInputDialog(QDialog):
             return
 
         threshold = self.freeze_threshold_spin.value()
-        sd_flags = []
-        for site in self.slab:
-            frac_z = site.frac_coords[2]
-            if frac_z < threshold:
-                sd_flags.append([False, False, False])  # Freeze
-            else:
-                sd_flags.append([True, True, True])     # Relax
+        # Freeze sites below the threshold, relax the rest (same flag on x/y/z)
+        relax = self.slab.frac_coords[:, 2] >= threshold
+        sd_flags = np.repeat(relax[:, None], 3, axis=1).tolist()
         self.slab.add_site_property("selective_dynamics", sd_flags)
+        # The dialog edits the window's slab in place; drop the regions cached
+        # for the surface comparison so a later cleave export is cut afresh
+        clear_slab_caches(self.slab)
 
     def _generate(self):
+        # Without keyboard tracking, text still being typed is not yet value()
+        for spin in self._spins:
+            spin.interpretText()
+
         output_dir = QFileDialog.getExistingDirectory(
             self, "Select Output Directory", self.suggested_dir_name
         )
@@ -1,32 +1,160 @@
+import logging
+import math
 import os
-from PySide6.QtCore import Qt, QThread, Signal
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
+from types import SimpleNamespace
+from PySide6.QtCore import Qt, QSettings, QThread, QTimer, Signal
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QListWidget,
     QSpinBox, QMessageBox, QGroupBox, QCheckBox, QDoubleSpinBox, QComboBox,
-    QFileDialog, QStatusBar, QFrame, QApplication,
-    QTextEdit, QTableWidget, QTableWidgetItem, QHeaderView,
+    QFileDialog, QStatusBar, QFrame,
+    QTextEdit, QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar,
+    QStackedWidget,
 )
 from PySide6.QtGui import QKeySequence, QShortcut
 
 from pymatgen.core import Structure
 
-try:
-    from mp_api.client import MPRester
-    HAS_MP_API = True
-except ImportError:
-    HAS_MP_API = False
-from pymatgen.io.vasp.inputs import Poscar
-from pymatgen.io.cif import CifWriter
-
 from core.slab_generator import (
     oriented_slab_replication,
     extract_surface_regions,
     compare_structures,
+    compare_slab_surfaces,
+    clear_slab_caches,
+    slab_z_bounds,
 )
-from ui.viewer_widget import StructureViewer
-from ui.screening_dialog import ScreeningDialog
-from ui.dft_dialog import DFTInputDialog
+from ui.workers import ExportWorker
+
+logger = logging.getLogger(__name__)
+
+# mp_api, pymatgen.io and the dialogs are imported where they are used:
+# loading them up front noticeably slows GUI startup.
+HAS_MP_API = find_spec("mp_api") is not None
+
+# Only the lightweight document fields the structure table reads; each
+# structure is fetched on its own when the user selects a row.
+MP_SEARCH_FIELDS = ["material_id", "formula_pretty", "symmetry", "nsites"]
+
+# Number of (api_key, formula) search results kept in memory
+SEARCH_CACHE_SIZE = 64
+
+# On-disk MP cache shared between app launches, and its entry lifetime
+DISK_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "slabgen", "mp_cache")
+DISK_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# Search and fetch workers read and write the shelve from several threads
+_DISK_CACHE_LOCK = threading.Lock()
+
+# Serializes requests on the shared MPRester: its HTTP session is not
+# safe to use from several worker threads at once
+_MPR_LOCK = threading.Lock()
+
+# Delay before the 3D viewer follows the slab selection (arrow-key scrolling)
+VIEWER_DELAY_MS = 120
+
+
+def _search_cache_key(formula):
+    return f"{formula}|{','.join(MP_SEARCH_FIELDS)}"
+
+
+def _structure_cache_key(material_id):
+    return f"structure|{material_id}"
+
+
+def _load_disk_cache(key):
+    """Return the cached value for key, or None if absent, stale or unreadable."""
+    try:
+        with _DISK_CACHE_LOCK, shelve.open(DISK_CACHE_PATH, flag="r") as db:
+            entry = db.get(key)
+    except Exception:
+        # Also the normal first-run case, before the cache file exists
+        logger.debug("Could not read MP disk cache entry %r", key, exc_info=True)
+        return None
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.time() - stored_at > DISK_CACHE_TTL:
+        return None
+    return value
+
+
+def _save_disk_cache(key, value):
+    """Best-effort write to the disk cache; a failed write only loses the cache."""
+    try:
+        os.makedirs(os.path.dirname(DISK_CACHE_PATH), exist_ok=True)
+        with _DISK_CACHE_LOCK, shelve.open(DISK_CACHE_PATH) as db:
+            db[key] = (time.time(), value)
+    except Exception:
+        logger.warning("Could not write MP disk cache entry %r", key, exc_info=True)
+
+
+def _doc_row(doc):
+    """Plain display values for one search result, resolved in a single pass."""
+    symmetry = doc.symmetry
+    return (
+        str(doc.material_id) if doc.material_id else "N/A",
+        str(doc.formula_pretty) if doc.formula_pretty else "N/A",
+        str(symmetry.symbol) if symmetry else "N/A",
+        str(symmetry.crystal_system) if symmetry else "N/A",
+        getattr(doc, "nsites", None) or 0,
+        getattr(doc, "energy_above_hull", None),
+    )
+
+
+def _slab_summary(slab):
+    """Display properties of one slab, computed once for the table and info panel."""
+    try:
+        sym_str = "Yes" if slab.is_symmetric() else "No"
+    except Exception:
+        sym_str = "N/A"
+    z_min, z_max = slab_z_bounds(slab)
+    formula = slab.composition.reduced_formula
+    shift = getattr(slab, "shift", None)
+    area = float(slab.surface_area)
+    a, b, c = slab.lattice.abc
+    alpha, beta, gamma = slab.lattice.angles
+    info = (
+        f"Formula:        {formula}\n"
+        f"Num atoms:      {len(slab)}\n"
+        f"Surface area:   {area:.2f} \u00c5\u00b2\n"
+        f"Slab thickness: {z_max - z_min:.2f} \u00c5\n"
+        f"Symmetric:      {sym_str}\n"
+        f"Shift:          {shift if shift is not None else 'N/A'}\n"
+        f"Lattice:        a={a:.3f}  b={b:.3f}  c={c:.3f} \u00c5\n"
+        f"Angles:         \u03b1={alpha:.1f}\u00b0  \u03b2={beta:.1f}\u00b0  \u03b3={gamma:.1f}\u00b0"
+    )
+    return {
+        "formula": formula,
+        "shift": shift,
+        "natoms": len(slab),
+        "area": area,
+        "symmetric": sym_str,
+        "info": info,  # pre-formatted info panel text
+    }
+
+
+def _plain_doc(doc):
+    """
+    Picklable copy of a search result holding only MP_SEARCH_FIELDS.
+
+    mp_api returns dynamically created pydantic models that pickle cannot
+    find by module path, so the caches keep these plain copies instead.
+    """
+    values = {field: getattr(doc, field, None) for field in MP_SEARCH_FIELDS}
+    if values.get("material_id") is not None:
+        values["material_id"] = str(values["material_id"])
+    symmetry = values.get("symmetry")
+    if symmetry is not None:
+        values["symmetry"] = SimpleNamespace(
+            symbol=str(symmetry.symbol),
+            crystal_system=str(symmetry.crystal_system))
+    return SimpleNamespace(**values)
 
 
 # ── Background Workers ──
@@ -36,27 +164,76 @@ class SearchWorker(QThread):
     finished = Signal(list)   # list of docs
     error = Signal(str)
 
-    def __init__(self, api_key, formula):
+    def __init__(self, api_key, formula, mpr=None):
         super().__init__()
         self.api_key = api_key
         self.formula = formula
+        self.mpr = mpr  # reused client; created on first search if None
 
     def run(self):
         try:
-            with MPRester(self.api_key) as mpr:
-                docs = mpr.materials.search(formula=self.formula)
+            cache_key = _search_cache_key(self.formula)
+            docs = _load_disk_cache(cache_key)
+            if docs is None:
+                if self.mpr is None:
+                    from mp_api.client import MPRester
+                    self.mpr = MPRester(self.api_key)
+                with _MPR_LOCK:
+                    docs = self.mpr.materials.search(
+                        formula=self.formula, fields=MP_SEARCH_FIELDS)
+                docs = [_plain_doc(doc) for doc in docs or []]
+                _save_disk_cache(cache_key, docs)
             self.finished.emit(docs if docs else [])
         except Exception as e:
             self.error.emit(str(e))
 
 
+class StructureWorker(QThread):
+    """Fetch one material's structure from MP in a background thread."""
+    finished = Signal(str, object)  # material_id, Structure
+    error = Signal(str, str)        # material_id, message
+
+    def __init__(self, api_key, material_id, mpr=None):
+        super().__init__()
+        self.api_key = api_key
+        self.material_id = material_id
+        self.mpr = mpr
+
+    def _search(self, mpr):
+        return mpr.materials.search(
+            material_ids=[self.material_id], fields=["structure"])
+
+    def run(self):
+        try:
+            cache_key = _structure_cache_key(self.material_id)
+            structure = _load_disk_cache(cache_key)
+            if structure is None:
+                if self.mpr is not None:
+                    with _MPR_LOCK:
+                        docs = self._search(self.mpr)
+                else:
+                    from mp_api.client import MPRester
+                    with MPRester(self.api_key) as mpr:
+                        docs = self._search(mpr)
+                if not docs or docs[0].structure is None:
+                    raise ValueError("No structure returned.")
+                structure = docs[0].structure
+                _save_disk_cache(cache_key, structure)
+            self.finished.emit(self.material_id, structure)
+        except Exception as e:
+            self.error.emit(self.material_id, str(e))
+
+
 class SlabWorker(QThread):
     """Run slab generation in a background thread."""
+    progress = Signal(int, int)  # current, total stages
     finished = Signal(list)   # list of Slab objects
     error = Signal(str)
 
     def __init__(self, structure, h, k, l, z_reps, min_vac,
-                 center_slab, all_terminations, force_ortho):
+                 center_slab, all_terminations, force_ortho,
+                 orient_cache=None, slab_cache=None, compare_depth=None,
+                 supercell=(1, 1)):
         super().__init__()
         self.structure = structure
         self.h, self.k, self.l = h, k, l
@@ -65,8 +242,16 @@ class SlabWorker(QThread):
         self.center_slab = center_slab
         self.all_terminations = all_terminations
         self.force_ortho = force_ortho
+        self.orient_cache = orient_cache
+        self.slab_cache = slab_cache
+        self.compare_depth = compare_depth
+        self.supercell = supercell  # in-plane (a, b) repeats
+        self.comparisons = []
+        self.summaries = []  # _slab_summary() per slab, built off the GUI thread
 
     def run(self):
+        # Three generation stages, plus one for the surface comparison
+        total = 3 if self.compare_depth is None else 4
         try:
             slabs = oriented_slab_replication(
                 structure=self.structure,
@@ -76,13 +261,46 @@ class SlabWorker(QThread):
                 center_slab=self.center_slab,
                 all_terminations=self.all_terminations,
                 force_ortho=self.force_ortho,
+                orient_cache=self.orient_cache,
+                slab_cache=self.slab_cache,
+                progress_callback=lambda cur, _: self.progress.emit(cur, total),
             )
+            if slabs and self.compare_depth is not None:
+                self.comparisons = compare_slab_surfaces(
+                    slabs, self.compare_depth)
+                self.progress.emit(total, total)
+            # In-plane supercell (Feature #18), after the surface comparison
+            sa, sb = self.supercell
+            if sa > 1 or sb > 1:
+                for slab in slabs or []:
+                    slab.make_supercell([sa, sb, 1])
+                    clear_slab_caches(slab)
+            self.summaries = [_slab_summary(slab) for slab in slabs or []]
             self.finished.emit(slabs if slabs else [])
         except Exception as e:
             self.error.emit(str(e))
 
 
+class FileLoadWorker(QThread):
+    """Parse an uploaded structure file in a background thread."""
+    finished = Signal(str, object)  # path, Structure
+    error = Signal(str, str)        # path, message
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def run(self):
+        try:
+            self.finished.emit(self.path, Structure.from_file(self.path))
+        except Exception as e:
+            self.error.emit(self.path, str(e))
+
+
 class MainWindow(QMainWindow):
+    # Translation table for filename-safe shift/vacuum values ("." -> "-")
+    _DOT_TRANS = str.maketrans({".": "-"})
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("SlabGen v1.0 — Surface Slab Generation Platform")
@@ -95,9 +313,25 @@ class MainWindow(QMainWindow):
         self.structure_docs = []
         self.selected_doc_index = None
         self.generated_slabs = []
+        self.generated_hkl = None  # (h, k, l) the slabs were generated for
+        self.slab_summaries = []  # _slab_summary() per generated slab
+        self.slab_comparisons = []  # (is_match, rmsd) per generated slab
         self.local_structure = None
         self._search_worker = None
         self._slab_worker = None
+        self._export_worker = None
+        self._file_worker = None
+        # Long-lived MPRester so repeat searches reuse its HTTP session
+        self._mpr = None
+        # LRU of (api_key, formula) -> docs, so repeat searches skip the network
+        self._search_cache = OrderedDict()
+        # Structures fetched on selection, and the fetches still running
+        self._doc_structures = {}
+        self._structure_workers = {}
+        # Oriented (h,k,l) bulk cells, reused while only z_reps/vacuum change
+        self._orient_cache = OrderedDict()
+        # Recent generation results, reused when only force_ortho changes
+        self._slab_cache = {}
 
         # Build UI
         central_widget = QWidget()
@@ -109,6 +343,10 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready — search Materials Project or upload a local structure file.")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.status_bar.addPermanentWidget(self.progress_bar)
 
         # ── 1) TOP SECTION: Search / OR / Upload ──
         top_layout = QHBoxLayout()
@@ -326,8 +564,14 @@ class MainWindow(QMainWindow):
 
         viewer_group = QGroupBox("3D Structure Viewer")
         viewer_vlayout = QVBoxLayout()
-        self.structure_viewer = StructureViewer()
-        viewer_vlayout.addWidget(self.structure_viewer)
+        # The matplotlib viewer is built on first use; a label stands in until then
+        self._viewer_stack = QStackedWidget()
+        viewer_placeholder = QLabel("No structure loaded")
+        viewer_placeholder.setAlignment(Qt.AlignCenter)
+        viewer_placeholder.setStyleSheet("color: gray;")
+        self._viewer_stack.addWidget(viewer_placeholder)
+        self._structure_viewer = None
+        viewer_vlayout.addWidget(self._viewer_stack)
         viewer_group.setLayout(viewer_vlayout)
         middle_section.addWidget(viewer_group, stretch=5)
 
@@ -358,43 +602,114 @@ class MainWindow(QMainWindow):
         QShortcut(QKeySequence("Ctrl+Shift+S"), self, self._open_screening_dialog)
         QShortcut(QKeySequence("Ctrl+O"), self, self.upload_bulk_structure)
 
+        # Render only the structure the selection settles on
+        self._pending_viewer_structure = None
+        self._viewer_timer = QTimer(self)
+        self._viewer_timer.setSingleShot(True)
+        self._viewer_timer.setInterval(VIEWER_DELAY_MS)
+        self._viewer_timer.timeout.connect(self._flush_viewer)
+
+        # Restore last-used generation parameters
+        self._settings = QSettings("SlabGen", "SlabGen")
+        self._restore_settings()
+
+    def _settings_widgets(self):
+        """Generation controls persisted across sessions, keyed by name."""
+        return {
+            "h": self.h_spin,
+            "k": self.k_spin,
+            "l": self.l_spin,
+            "z_reps": self.zreps_spin,
+            "supercell_a": self.supercell_a_spin,
+            "supercell_b": self.supercell_b_spin,
+            "vacuum": self.vacuum_spin,
+            "vac_placement": self.vac_placement_combo,
+            "force_ortho": self.ortho_check,
+            "all_terminations": self.all_terminations_check,
+            "compare": self.comparison_check,
+            "cleaves": self.generate_cleaves_check,
+            "compare_depth": self.compare_depth_spin,
+        }
+
+    def _restore_settings(self):
+        for key, widget in self._settings_widgets().items():
+            if not self._settings.contains(key):
+                continue
+            if isinstance(widget, QCheckBox):
+                widget.setChecked(self._settings.value(key, False, type=bool))
+            elif isinstance(widget, QComboBox):
+                idx = widget.findText(str(self._settings.value(key)))
+                if idx >= 0:
+                    widget.setCurrentIndex(idx)
+            elif isinstance(widget, QDoubleSpinBox):
+                widget.setValue(self._settings.value(key, widget.value(), type=float))
+            else:
+                widget.setValue(self._settings.value(key, widget.value(), type=int))
+
+    def _save_settings(self):
+        for key, widget in self._settings_widgets().items():
+            if isinstance(widget, QCheckBox):
+                self._settings.setValue(key, widget.isChecked())
+            elif isinstance(widget, QComboBox):
+                self._settings.setValue(key, widget.currentText())
+            else:
+                self._settings.setValue(key, widget.value())
+
+    @property
+    def structure_viewer(self):
+        """The 3D viewer, created (with its matplotlib imports) on first access."""
+        if self._structure_viewer is None:
+            from ui.viewer_widget import StructureViewer
+
+            self._structure_viewer = StructureViewer()
+            self._viewer_stack.addWidget(self._structure_viewer)
+            self._viewer_stack.setCurrentWidget(self._structure_viewer)
+        return self._structure_viewer
+
+    def closeEvent(self, event):
+        """Save generation parameters and close the cached MPRester session."""
+        self._save_settings()
+        # Running fetches and searches may still hold the shared MPRester
+        for worker in list(self._structure_workers.values()):
+            worker.wait()
+        if self._search_worker is not None:
+            self._search_worker.wait()
+            self._mpr = self._mpr or self._search_worker.mpr
+        if self._mpr is not None:
+            self._mpr.__exit__(None, None, None)
+            self._mpr = None
+        super().closeEvent(event)
+
     # ── UI Helpers ──
 
     def _on_slab_selected(self, row):
         """Update 3D viewer and info panel when user selects a slab."""
-        if 0 <= row < len(self.generated_slabs):
-            slab = self.generated_slabs[row]
-            self.structure_viewer.update_structure(slab)
-            self._update_slab_info(slab)
+        if 0 <= row < len(self.slab_summaries):
+            comparison = (self.slab_comparisons[row]
+                          if row < len(self.slab_comparisons) else None)
+            self._show_in_viewer(self.generated_slabs[row])
+            self._update_slab_info(self.slab_summaries[row], comparison)
         else:
             self.slab_info_text.clear()
 
-    def _update_slab_info(self, slab):
-        """Populate the slab properties info panel (UX #7 + Feature #20)."""
-        all_z = [site.coords[2] for site in slab]
-        z_min, z_max = min(all_z), max(all_z)
-        thickness = z_max - z_min
+    def _show_in_viewer(self, structure):
+        """Queue a structure for the 3D viewer; only the latest one is drawn."""
+        self._pending_viewer_structure = structure
+        self._viewer_timer.start()
 
-        try:
-            is_sym = slab.is_symmetric()
-            sym_str = "Yes" if is_sym else "No"
-        except Exception:
-            sym_str = "N/A"
-
-        a, b, c = slab.lattice.abc
-        alpha, beta, gamma = slab.lattice.angles
-        shift_val = getattr(slab, "shift", "N/A")
-
-        info = (
-            f"Formula:        {slab.composition.reduced_formula}\n"
-            f"Num atoms:      {len(slab)}\n"
-            f"Surface area:   {slab.surface_area:.2f} \u00c5\u00b2\n"
-            f"Slab thickness: {thickness:.2f} \u00c5\n"
-            f"Symmetric:      {sym_str}\n"
-            f"Shift:          {shift_val}\n"
-            f"Lattice:        a={a:.3f}  b={b:.3f}  c={c:.3f} \u00c5\n"
-            f"Angles:         \u03b1={alpha:.1f}\u00b0  \u03b2={beta:.1f}\u00b0  \u03b3={gamma:.1f}\u00b0"
-        )
+    def _flush_viewer(self):
+        structure = self._pending_viewer_structure
+        self._pending_viewer_structure = None
+        if structure is not None:
+            self.structure_viewer.update_structure(structure)
+
+    def _update_slab_info(self, summary, comparison=None):
+        """Populate the slab properties info panel (UX #7 + Feature #20)."""
+        info = summary["info"]
+        if comparison is not None:
+            is_match, rmsd = comparison
+            match_str = f"Yes (RMSD {rmsd:.4f})" if is_match else "No"
+            info += f"\nSurface match:  {match_str}"
         self.slab_info_text.setPlainText(info)
 
     def _toggle_comparison_options(self):
@@ -403,22 +718,44 @@ class MainWindow(QMainWindow):
         self.generate_cleaves_check.setEnabled(do_compare)
 
     def _read_api_key(self, path):
-        if not os.path.exists(path):
+        """Return the MP API key from $MP_API_KEY, else from the key file."""
+        env_key = os.environ.get("MP_API_KEY", "").strip()
+        if env_key:
+            return env_key
+        try:
+            with open(path, "r") as f:
+                return f.read().strip()
+        except OSError:
             return ""
-        with open(path, "r") as f:
-            return f.read().strip()
 
     def _get_chosen_structure(self):
-        """Return the currently selected bulk structure, or None."""
+        """
+        Return the currently selected bulk structure, or None.
+
+        The structure is shared, not copied: callers must treat it as
+        read-only (oriented_slab_replication never mutates its input).
+        """
         if self.local_structure is not None:
-            return self.local_structure.copy()
+            return self.local_structure
         if (self.selected_doc_index is not None and
                 0 <= self.selected_doc_index < len(self.structure_docs)):
             doc = self.structure_docs[self.selected_doc_index]
-            if doc.structure:
-                return doc.structure.copy()
+            return self._doc_structures.get(str(doc.material_id))
         return None
 
+    def _warn_no_structure(self):
+        """Explain why _get_chosen_structure() returned None."""
+        doc = self._selected_doc()
+        if (self.local_structure is None and doc is not None
+                and str(doc.material_id) in self._structure_workers):
+            QMessageBox.information(
+                self, "Structure Loading",
+                f"Structure still loading for {doc.material_id}. "
+                "Try again once it is shown.")
+        else:
+            QMessageBox.warning(self, "Error",
+                                "No bulk structure. Select from MP or upload a POSCAR first.")
+
     def _get_material_id(self):
         """Return material ID string for filename."""
         if self.local_structure is not None:
@@ -442,10 +779,11 @@ class MainWindow(QMainWindow):
 
     def _open_screening_dialog(self):
         """Open the batch surface screening dialog."""
+        from ui.screening_dialog import ScreeningDialog
+
         structure = self._get_chosen_structure()
         if structure is None:
-            QMessageBox.warning(self, "Error",
-                                "No bulk structure. Select from MP or upload a POSCAR first.")
+            self._warn_no_structure()
             return
         # UX #9: Pass current main window parameters to screening dialog
         params = {
@@ -465,21 +803,11 @@ class MainWindow(QMainWindow):
         self.k_spin.setValue(k)
         self.l_spin.setValue(l)
         self.generated_slabs = [slab]
-        self.slabs_table.setRowCount(1)
-
+        self.generated_hkl = (h, k, l)
+        self.slab_summaries = [_slab_summary(slab)]
+        self.slab_comparisons = []
+        self._fill_slab_table()
         shift_val = getattr(slab, "shift", 0.0)
-        formula = slab.composition.reduced_formula
-
-        try:
-            sym_str = "Yes" if slab.is_symmetric() else "No"
-        except Exception:
-            sym_str = "N/A"
-
-        self.slabs_table.setItem(0, 0, QTableWidgetItem(formula))
-        self.slabs_table.setItem(0, 1, QTableWidgetItem(f"{float(shift_val):.4f}"))
-        self.slabs_table.setItem(0, 2, QTableWidgetItem(str(len(slab))))
-        self.slabs_table.setItem(0, 3, QTableWidgetItem(f"{float(slab.surface_area):.2f}"))
-        self.slabs_table.setItem(0, 4, QTableWidgetItem(sym_str))
 
         self.slabs_table.setCurrentCell(0, 0)
         self.status_bar.showMessage(
@@ -488,6 +816,9 @@ class MainWindow(QMainWindow):
     # ── Search & Upload (UX #6: background thread, UX #13: richer info) ──
 
     def search_structures(self):
+        # Return in the formula box bypasses the disabled Search button
+        if not self.search_button.isEnabled():
+            return
         formula = self.formula_input.text().strip()
         if not formula:
             QMessageBox.warning(self, "Error", "Please enter a formula or upload a bulk file.")
@@ -500,22 +831,44 @@ class MainWindow(QMainWindow):
             return
         if not self.api_key:
             QMessageBox.warning(self, "Warning",
-                                "No API key found. Provide mp_api_key.txt or use local upload.")
+                                "No API key found. Set MP_API_KEY, provide mp_api_key.txt, "
+                                "or use local upload.")
             return
 
         self.struct_table.setRowCount(0)
-        self.structure_docs.clear()
+        self.structure_docs = []
+        self._orient_cache.clear()
+        self._slab_cache.clear()
+
+        cache_key = (self.api_key, formula)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            self._search_cache.move_to_end(cache_key)
+            self._on_search_finished(cached)
+            return
+
         self._set_controls_enabled(False)
         self.status_bar.showMessage(f"Searching Materials Project for '{formula}'...")
-        QApplication.processEvents()
+        self.progress_bar.setRange(0, 0)  # busy indicator until results arrive
+        self.progress_bar.setVisible(True)
 
-        self._search_worker = SearchWorker(self.api_key, formula)
+        self._search_worker = SearchWorker(self.api_key, formula, self._mpr)
+        self._search_worker.finished.connect(
+            lambda docs, key=cache_key: self._store_search_results(key, docs))
         self._search_worker.finished.connect(self._on_search_finished)
         self._search_worker.error.connect(self._on_search_error)
         self._search_worker.start()
 
+    def _store_search_results(self, cache_key, docs):
+        """Keep fresh search results (and the worker's client) for reuse."""
+        self._mpr = self._search_worker.mpr
+        self._search_cache[cache_key] = docs
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+
     def _on_search_finished(self, docs):
         self._set_controls_enabled(True)
+        self.progress_bar.setVisible(False)
         if not docs:
             formula = self.formula_input.text().strip()
             self.status_bar.showMessage(f"No results for '{formula}'.")
@@ -524,15 +877,13 @@ class MainWindow(QMainWindow):
             return
 
         self.structure_docs = docs
+        # Fill the whole table with repaints off, then redraw once
+        self.struct_table.setUpdatesEnabled(False)
+        self.struct_table.blockSignals(True)
         self.struct_table.setRowCount(len(docs))
-        for row, doc in enumerate(docs):
-            mat_id = str(doc.material_id) if doc.material_id else "N/A"
-            pretty_formula = str(doc.formula_pretty) if doc.formula_pretty else "N/A"
-            sg_symbol = str(doc.symmetry.symbol) if doc.symmetry else "N/A"
-            crystal_sys = str(doc.symmetry.crystal_system) if doc.symmetry else "N/A"
-            n_atoms = len(doc.structure) if doc.structure else 0
-            e_hull = getattr(doc, "energy_above_hull", None)
-
+        rows = [_doc_row(doc) for doc in docs]
+        for row, (mat_id, pretty_formula, sg_symbol, crystal_sys,
+                  n_atoms, e_hull) in enumerate(rows):
             self.struct_table.setItem(row, 0, QTableWidgetItem(mat_id))
             self.struct_table.setItem(row, 1, QTableWidgetItem(pretty_formula))
             self.struct_table.setItem(row, 2, QTableWidgetItem(sg_symbol))
@@ -548,6 +899,8 @@ class MainWindow(QMainWindow):
             else:
                 ehull_item.setText("N/A")
             self.struct_table.setItem(row, 5, ehull_item)
+        self.struct_table.blockSignals(False)
+        self.struct_table.setUpdatesEnabled(True)
 
         self.local_structure = None
         self.selected_doc_index = None
@@ -555,7 +908,9 @@ class MainWindow(QMainWindow):
             f"Found {len(docs)} structures for '{self.formula_input.text().strip()}'.")
 
     def _on_search_error(self, error_msg):
+        self._mpr = self._search_worker.mpr
         self._set_controls_enabled(True)
+        self.progress_bar.setVisible(False)
         self.status_bar.showMessage("Search failed.")
         QMessageBox.critical(self, "Search Error", f"Error:\n{error_msg}")
 
@@ -564,14 +919,54 @@ class MainWindow(QMainWindow):
         if (self.selected_doc_index is not None and
                 0 <= self.selected_doc_index < len(self.structure_docs)):
             doc = self.structure_docs[self.selected_doc_index]
-            if doc.structure:
-                self.structure_viewer.update_structure(doc.structure)
-                mat_id = doc.material_id
-                self.status_bar.showMessage(
-                    f"Selected {mat_id} — {doc.formula_pretty} "
-                    f"({len(doc.structure)} atoms)")
+            mat_id = str(doc.material_id)
+            structure = self._doc_structures.get(mat_id)
+            if structure is not None:
+                self._show_doc_structure(doc, structure)
+            elif mat_id not in self._structure_workers:
+                # Search results carry no structures; fetch this one now
+                self.status_bar.showMessage(f"Fetching structure for {mat_id}...")
+                worker = StructureWorker(self.api_key, mat_id, self._mpr)
+                worker.finished.connect(self._on_structure_fetched)
+                worker.error.connect(self._on_structure_error)
+                self._structure_workers[mat_id] = worker
+                worker.start()
+
+    def _show_doc_structure(self, doc, structure):
+        self._show_in_viewer(structure)
+        self.status_bar.showMessage(
+            f"Selected {doc.material_id} — {doc.formula_pretty} "
+            f"({len(structure)} atoms)")
+
+    def _selected_doc(self):
+        if (self.selected_doc_index is not None and
+                0 <= self.selected_doc_index < len(self.structure_docs)):
+            return self.structure_docs[self.selected_doc_index]
+        return None
+
+    def _finish_structure_worker(self, mat_id):
+        """Drop a fetch worker once its run() has returned."""
+        worker = self._structure_workers.pop(mat_id, None)
+        if worker is not None:
+            worker.wait()
+
+    def _on_structure_fetched(self, mat_id, structure):
+        self._finish_structure_worker(mat_id)
+        self._doc_structures[mat_id] = structure
+        doc = self._selected_doc()
+        if doc is not None and str(doc.material_id) == mat_id:
+            self._show_doc_structure(doc, structure)
+
+    def _on_structure_error(self, mat_id, error_msg):
+        self._finish_structure_worker(mat_id)
+        self.status_bar.showMessage(f"Failed to fetch structure for {mat_id}.")
+        QMessageBox.warning(self, "Fetch Error",
+                            f"Failed to fetch structure for {mat_id}:\n{error_msg}")
 
     def upload_bulk_structure(self):
+        # Ctrl+O bypasses the disabled button while a file is still parsing
+        if not self.upload_button.isEnabled():
+            return
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Select a bulk structure file",
@@ -579,28 +974,47 @@ class MainWindow(QMainWindow):
             "Structure files (*.vasp *.cif *.POSCAR *.CONTCAR);;CIF files (*.cif);;VASP files (*.vasp *.POSCAR *.CONTCAR);;All Files (*)"
         )
         if file_path:
-            try:
-                struct = Structure.from_file(file_path)
-                self.local_structure = struct
-                self.filename_line.setText(os.path.basename(file_path))
-                self.struct_table.setRowCount(0)
-                self.structure_docs.clear()
-                self.selected_doc_index = None
-                self.structure_viewer.update_structure(struct)
-                self.status_bar.showMessage(
-                    f"Loaded {os.path.basename(file_path)} — "
-                    f"{struct.composition.reduced_formula} ({len(struct)} atoms)")
-            except Exception as ex:
-                QMessageBox.critical(self, "Error",
-                                     f"Failed to read structure:\n{str(ex)}")
+            self.status_bar.showMessage(f"Reading {os.path.basename(file_path)}...")
+            self.upload_button.setEnabled(False)
+            self._file_worker = FileLoadWorker(file_path)
+            self._file_worker.finished.connect(self._on_file_loaded)
+            self._file_worker.error.connect(self._on_file_error)
+            self._file_worker.start()
+
+    def _finish_file_worker(self):
+        """Let the upload worker's run() return, then allow the next upload."""
+        self._file_worker.wait()
+        self.upload_button.setEnabled(True)
+
+    def _on_file_loaded(self, file_path, struct):
+        self._finish_file_worker()
+        self.local_structure = struct
+        self._orient_cache.clear()
+        self._slab_cache.clear()
+        self.filename_line.setText(os.path.basename(file_path))
+        self.struct_table.setRowCount(0)
+        self.structure_docs = []
+        self.selected_doc_index = None
+        self._show_in_viewer(struct)
+        self.status_bar.showMessage(
+            f"Loaded {os.path.basename(file_path)} — "
+            f"{struct.composition.reduced_formula} ({len(struct)} atoms)")
+
+    def _on_file_error(self, file_path, error_msg):
+        self._finish_file_worker()
+        self.status_bar.showMessage("Failed to read structure.")
+        QMessageBox.critical(self, "Error",
+                             f"Failed to read structure:\n{error_msg}")
 
     # ── Generate Slabs (UX #6: background thread) ──
 
     def generate_slabs(self):
+        # Ctrl+G bypasses the disabled button while a worker is running
+        if not self.generate_slabs_button.isEnabled():
+            return
         chosen_structure = self._get_chosen_structure()
         if chosen_structure is None:
-            QMessageBox.warning(self, "Error",
-                                "No bulk structure. Select from MP or upload a POSCAR.")
+            self._warn_no_structure()
             return
 
         h = self.h_spin.value()
@@ -612,6 +1026,13 @@ class MainWindow(QMainWindow):
                                 "Miller indices (0,0,0) are invalid. At least one must be non-zero.")
             return
 
+        # SlabGenerator reduces (2,2,0) to (1,1,0) anyway; reduce here so
+        # equivalent indices share the orientation and slab caches. The spin
+        # boxes keep the user's input; generated_hkl names the slabs.
+        g = math.gcd(math.gcd(h, k), l_val)
+        if g > 1:
+            h, k, l_val = h // g, k // g, l_val // g
+
         z_reps = self.zreps_spin.value()
         vac_thick = self.vacuum_spin.value()
         center_slab = (self.vac_placement_combo.currentText() == "centered")
@@ -620,26 +1041,56 @@ class MainWindow(QMainWindow):
 
         self.slabs_table.setRowCount(0)
         self.generated_slabs.clear()
+        self.slab_summaries = []
+        self.slab_comparisons = []
         self.slab_info_text.clear()
         self._set_controls_enabled(False)
         self.status_bar.showMessage(
             f"Generating ({h},{k},{l_val}) slabs...")
 
-        # Store comparison settings for use in callback
-        self._pending_compare = self.comparison_check.isChecked()
-        self._pending_compare_depth = self.compare_depth_spin.value()
-        self._pending_supercell = (self.supercell_a_spin.value(),
-                                   self.supercell_b_spin.value())
+        # Top/bottom comparison runs in the worker right after generation
+        compare_depth = (self.compare_depth_spin.value()
+                         if self.comparison_check.isChecked() else None)
 
         self._slab_worker = SlabWorker(
             chosen_structure, h, k, l_val, z_reps, vac_thick,
-            center_slab, all_terms, force_ortho)
+            center_slab, all_terms, force_ortho,
+            orient_cache=self._orient_cache, slab_cache=self._slab_cache,
+            compare_depth=compare_depth,
+            supercell=(self.supercell_a_spin.value(),
+                       self.supercell_b_spin.value()))
+        self._slab_worker.progress.connect(self._on_slab_progress)
         self._slab_worker.finished.connect(self._on_slabs_generated)
         self._slab_worker.error.connect(self._on_slab_error)
+        self.progress_bar.setRange(0, 3)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
         self._slab_worker.start()
 
+    def _fill_slab_table(self):
+        """Fill the slab table from self.slab_summaries in one batch."""
+        self.slabs_table.setUpdatesEnabled(False)
+        self.slabs_table.blockSignals(True)
+        self.slabs_table.setRowCount(len(self.slab_summaries))
+        for i, summary in enumerate(self.slab_summaries):
+            shift_val = summary["shift"] if summary["shift"] is not None else float(i)
+            self.slabs_table.setItem(i, 0, QTableWidgetItem(summary["formula"]))
+            self.slabs_table.setItem(i, 1, QTableWidgetItem(f"{float(shift_val):.4f}"))
+            atoms_item = QTableWidgetItem()
+            atoms_item.setData(Qt.DisplayRole, summary["natoms"])
+            self.slabs_table.setItem(i, 2, atoms_item)
+            self.slabs_table.setItem(i, 3, QTableWidgetItem(f"{summary['area']:.2f}"))
+            self.slabs_table.setItem(i, 4, QTableWidgetItem(summary["symmetric"]))
+        self.slabs_table.blockSignals(False)
+        self.slabs_table.setUpdatesEnabled(True)
+
+    def _on_slab_progress(self, current, total):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+
     def _on_slabs_generated(self, final_slabs):
         self._set_controls_enabled(True)
+        self.progress_bar.setVisible(False)
 
         if not final_slabs:
             self.status_bar.showMessage("No slabs generated.")
@@ -647,50 +1098,27 @@ class MainWindow(QMainWindow):
                                     "No slabs were created with these parameters.")
             return
 
-        # Apply in-plane supercell if requested (Feature #18)
-        sa, sb = self._pending_supercell
-        if sa > 1 or sb > 1:
-            expanded = []
-            for slab in final_slabs:
-                slab.make_supercell([sa, sb, 1])
-                expanded.append(slab)
-            final_slabs = expanded
-
-        do_compare = self._pending_compare
-        compare_depth = self._pending_compare_depth
-
         self.generated_slabs = final_slabs
-        self.slabs_table.setRowCount(len(final_slabs))
-
-        for i, slab in enumerate(final_slabs):
-            shift_val = getattr(slab, "shift", float(i))
-            formula = slab.composition.reduced_formula
-            n_atoms = len(slab)
-            area = slab.surface_area
-
-            try:
-                is_sym = slab.is_symmetric()
-                sym_str = "Yes" if is_sym else "No"
-            except Exception:
-                sym_str = "N/A"
-
-            self.slabs_table.setItem(i, 0, QTableWidgetItem(formula))
-            self.slabs_table.setItem(i, 1, QTableWidgetItem(f"{float(shift_val):.4f}"))
-            self.slabs_table.setItem(i, 2, QTableWidgetItem(str(int(n_atoms))))
-            self.slabs_table.setItem(i, 3, QTableWidgetItem(f"{float(area):.2f}"))
-            self.slabs_table.setItem(i, 4, QTableWidgetItem(sym_str))
+        self.generated_hkl = (self._slab_worker.h, self._slab_worker.k,
+                              self._slab_worker.l)
+        self.slab_comparisons = self._slab_worker.comparisons
+        self.slab_summaries = self._slab_worker.summaries
+        self._fill_slab_table()
 
         if self.generated_slabs:
             self.slabs_table.setCurrentCell(0, 0)
 
-        h = self.h_spin.value()
-        k = self.k_spin.value()
-        l_val = self.l_spin.value()
+        h, k, l_val = self.generated_hkl
+        entered = (self.h_spin.value(), self.k_spin.value(), self.l_spin.value())
+        reduced_note = ("" if entered == self.generated_hkl else
+                        f" (reduced from ({entered[0]},{entered[1]},{entered[2]}))")
         self.status_bar.showMessage(
-            f"Generated {len(final_slabs)} slab(s) for ({h},{k},{l_val}).")
+            f"Generated {len(final_slabs)} slab(s) for ({h},{k},{l_val})"
+            f"{reduced_note}.")
 
     def _on_slab_error(self, error_msg):
         self._set_controls_enabled(True)
+        self.progress_bar.setVisible(False)
         self.status_bar.showMessage("Slab generation failed.")
         QMessageBox.critical(self, "Error", f"Slab generation error:\n{error_msg}")
 
@@ -698,13 +1126,15 @@ class MainWindow(QMainWindow):
 
     def _open_dft_dialog(self):
         """Open the DFT input generation dialog for the selected slab."""
+        from ui.dft_dialog import DFTInputDialog
+
         slab_index = self.slabs_table.currentRow()
         if slab_index < 0 or slab_index >= len(self.generated_slabs):
             QMessageBox.warning(self, "Error", "No slab selected.")
             return
         slab = self.generated_slabs[slab_index]
         mat_id = self._get_material_id()
-        h, k, l_val = self.h_spin.value(), self.k_spin.value(), self.l_spin.value()
+        h, k, l_val = self._slab_hkl()
         suggested = f"{mat_id}_{h}{k}{l_val}_dft"
         dialog = DFTInputDialog(slab, suggested_dir_name=suggested, parent=self)
         dialog.exec()
@@ -718,9 +1148,11 @@ class MainWindow(QMainWindow):
             return
         try:
             slab = self.generated_slabs[slab_index]
-            save_path = self._save_slab_dialog(slab, slab_index)
-            if not save_path:
+            target = self._save_slab_dialog(slab, slab_index)
+            if not target:
                 return
+            save_path, fmt = target
+            jobs = [(save_path, slab, fmt)]
 
             do_compare = self.comparison_check.isChecked()
             do_cleaves = self.generate_cleaves_check.isChecked()
@@ -733,38 +1165,56 @@ class MainWindow(QMainWindow):
                 top_path = f"{base_no_ext}_top.vasp"
                 bottom_path = f"{base_no_ext}_bottom_rot.vasp"
 
-                if top_struct and len(top_struct) > 0:
-                    Poscar(top_struct).write_file(top_path)
-                if bottom_rot and len(bottom_rot) > 0:
-                    Poscar(bottom_rot).write_file(bottom_path)
+                for path, struct in ((top_path, top_struct),
+                                     (bottom_path, bottom_rot)):
+                    if struct and len(struct) > 0:
+                        jobs.append((path, struct, "poscar"))
 
                 msg = (f"Exported slab => {save_path}\n"
                        f"Top => {top_path}\nBottom(rot) => {bottom_path}")
             else:
                 msg = f"Exported slab => {save_path}"
 
-            self.status_bar.showMessage(f"Exported slab to {os.path.basename(save_path)}")
-            QMessageBox.information(self, "Success", msg)
+            self._start_export(
+                jobs, f"Exported slab to {os.path.basename(save_path)}",
+                "Success", msg)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Export error:\n{str(e)}")
 
-    def _save_slab_dialog(self, slab, slab_index):
-        """Show save dialog and write slab file. Returns saved path or None."""
-        mat_id = self._get_material_id()
-        h = self.h_spin.value()
-        k = self.k_spin.value()
-        l_val = self.l_spin.value()
-        z_reps = self.zreps_spin.value()
-        vac_thick = self.vacuum_spin.value()
-        ortho_flag = "ortho" if self.ortho_check.isChecked() else "nonortho"
-        vac_mode = self.vac_placement_combo.currentText()
-        shift_val = getattr(slab, "shift", slab_index)
+    def _start_export(self, jobs, status_msg, title, msg):
+        """Write export jobs in an ExportWorker; report when all are on disk."""
+        self._set_controls_enabled(False)
+        self.status_bar.showMessage("Exporting...")
+        self.progress_bar.setRange(0, len(jobs))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self._export_worker = ExportWorker(jobs)
+        self._export_worker.progress.connect(self._on_export_progress)
+        self._export_worker.finished.connect(
+            lambda _count: self._on_export_finished(status_msg, title, msg))
+        self._export_worker.error.connect(self._on_export_error)
+        self._export_worker.start()
+
+    def _on_export_progress(self, current, total):
+        self.progress_bar.setValue(current)
+        self.status_bar.showMessage(f"Exporting... {current}/{total}")
+
+    def _on_export_finished(self, status_msg, title, msg):
+        self._set_controls_enabled(True)
+        self.progress_bar.setVisible(False)
+        self.status_bar.showMessage(status_msg)
+        QMessageBox.information(self, title, msg)
+
+    def _on_export_error(self, error_msg):
+        self._set_controls_enabled(True)
+        self.progress_bar.setVisible(False)
+        self.status_bar.showMessage("Export failed.")
+        QMessageBox.critical(self, "Error", f"Export error:\n{error_msg}")
 
-        main_name = (
-            f"POSCAR_{mat_id}_{h}-{k}-{l_val}_z{z_reps}_"
-            f"vac{vac_thick}_{vac_mode}{ortho_flag}_shift{shift_val}"
-        ).replace(".", "-") + ".vasp"
+    def _save_slab_dialog(self, slab, slab_index):
+        """Ask where to save the slab. Returns (path, "cif" | "poscar") or None."""
+        main_name = self._slab_filename(self._slab_file_prefix(), slab, slab_index)
 
         save_path, selected_filter = QFileDialog.getSaveFileName(
             self, "Save Slab", main_name,
@@ -774,11 +1224,30 @@ class MainWindow(QMainWindow):
             return None
 
         if save_path.endswith(".cif") or "CIF" in selected_filter:
-            CifWriter(slab).write_file(save_path)
-        else:
-            Poscar(slab).write_file(save_path)
+            return save_path, "cif"
+        return save_path, "poscar"
+
+    def _slab_hkl(self):
+        """Miller indices of the generated slabs, after any gcd reduction."""
+        if self.generated_hkl is not None:
+            return self.generated_hkl
+        return (self.h_spin.value(), self.k_spin.value(), self.l_spin.value())
+
+    def _slab_file_prefix(self):
+        """Filename part shared by every slab of the current generation settings."""
+        mat_id = self._get_material_id()
+        h, k, l_val = self._slab_hkl()
+        z_reps = self.zreps_spin.value()
+        vac_thick = self.vacuum_spin.value()
+        ortho_flag = "ortho" if self.ortho_check.isChecked() else "nonortho"
+        vac_mode = self.vac_placement_combo.currentText()
+        return (f"POSCAR_{mat_id}_{h}-{k}-{l_val}_z{z_reps}_"
+                f"vac{vac_thick}_{vac_mode}{ortho_flag}")
 
-        return save_path
+    def _slab_filename(self, prefix, slab, slab_index):
+        """Suggested .vasp filename for one slab, with dots made filename-safe."""
+        shift_val = getattr(slab, "shift", slab_index)
+        return f"{prefix}_shift{shift_val}".translate(self._DOT_TRANS) + ".vasp"
 
     def _export_all_slabs(self):
         """Export all generated slabs to a directory (Feature #22)."""
@@ -791,29 +1260,16 @@ class MainWindow(QMainWindow):
         if not output_dir:
             return
 
-        mat_id = self._get_material_id()
-        h = self.h_spin.value()
-        k = self.k_spin.value()
-        l_val = self.l_spin.value()
-        z_reps = self.zreps_spin.value()
-        vac_thick = self.vacuum_spin.value()
-        ortho_flag = "ortho" if self.ortho_check.isChecked() else "nonortho"
-        vac_mode = self.vac_placement_combo.currentText()
-
+        prefix = self._slab_file_prefix()
         exported = []
+        jobs = []
         for i, slab in enumerate(self.generated_slabs):
-            shift_val = getattr(slab, "shift", i)
-            fname = (
-                f"POSCAR_{mat_id}_{h}-{k}-{l_val}_z{z_reps}_"
-                f"vac{vac_thick}_{vac_mode}{ortho_flag}_shift{shift_val}"
-            ).replace(".", "-") + ".vasp"
-            fpath = os.path.join(output_dir, fname)
-            Poscar(slab).write_file(fpath)
+            fname = self._slab_filename(prefix, slab, i)
+            jobs.append((os.path.join(output_dir, fname), slab, "poscar"))
             exported.append(fname)
 
-        self.status_bar.showMessage(
-            f"Exported {len(exported)} slabs to {output_dir}")
-        QMessageBox.information(
-            self, "Export Complete",
+        self._start_export(
+            jobs, f"Exported {len(exported)} slabs to {output_dir}",
+            "Export Complete",
             f"Exported {len(exported)} slabs to:\n{output_dir}\n\n"
             + "\n".join(f"  {f}" for f in exported))
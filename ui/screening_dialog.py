@@ -1,16 +1,25 @@
 import csv
+import io
 import os
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QThread, Signal,
+)
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox,
     QDoubleSpinBox, QCheckBox, QComboBox, QPushButton,
-    QProgressBar, QTableWidget, QTableWidgetItem, QGroupBox,
+    QProgressBar, QTableView, QAbstractItemView, QGroupBox,
     QFileDialog, QMessageBox, QHeaderView,
 )
 from PySide6.QtGui import QColor
 
-from pymatgen.io.vasp.inputs import Poscar
 from core.screening import SurfaceScreener
+from ui.workers import ExportWorker
+
+# (background, foreground) of the Symmetric cell, keyed by is_symmetric
+SYMMETRY_COLORS = {
+    True: (QColor(200, 255, 200), QColor(0, 80, 0)),
+    False: (QColor(255, 255, 200), QColor(120, 100, 0)),
+}
 
 
 class ScreeningWorker(QThread):
@@ -33,6 +42,59 @@ class ScreeningWorker(QThread):
             self.error.emit(str(e))
 
 
+class ScreeningTableModel(QAbstractTableModel):
+    """Read-only table model over the screening result dicts."""
+    HEADERS = ("Miller Index", "Shift", "Atoms", "Surface Area (\u00c5\u00b2)",
+               "Symmetric", "Formula")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._results = []
+
+    def set_results(self, results):
+        self.beginResetModel()
+        self._results = results
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._results)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self._results[index.row()]
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            # Numeric values so the proxy sorts these columns numerically
+            if col == 0:
+                return r["miller_str"]
+            if col == 1:
+                return float(round(r["shift"], 4))
+            if col == 2:
+                return int(r["num_atoms"])
+            if col == 3:
+                return float(round(r["surface_area"], 2))
+            if col == 4:
+                sym = r["is_symmetric"]
+                return "Yes" if sym else ("No" if sym is not None else "N/A")
+            return r["formula"]
+
+        if col == 4 and role in (Qt.BackgroundRole, Qt.ForegroundRole):
+            colors = SYMMETRY_COLORS.get(r["is_symmetric"])
+            if colors:
+                return colors[0] if role == Qt.BackgroundRole else colors[1]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+
 class ScreeningDialog(QDialog):
     """Dialog for batch surface screening with results table."""
 
@@ -46,6 +108,7 @@ class ScreeningDialog(QDialog):
         self.structure = structure
         self.results = []
         self._worker = None
+        self._export_worker = None
 
         layout = QVBoxLayout()
         self.setLayout(layout)
@@ -109,14 +172,14 @@ class ScreeningDialog(QDialog):
         layout.addLayout(run_layout)
 
         # ── Results Table ──
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "Miller Index", "Shift", "Atoms", "Surface Area (\u00c5\u00b2)",
-            "Symmetric", "Formula"
-        ])
+        # Cells are read from self.results on demand; the proxy handles sorting
+        self._model = ScreeningTableModel(self)
+        self._proxy = QSortFilterProxyModel(self)
+        self._proxy.setSourceModel(self._model)
+        self.table = QTableView()
+        self.table.setModel(self._proxy)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
 
@@ -149,7 +212,7 @@ class ScreeningDialog(QDialog):
         self.run_button.setEnabled(False)
         self.progress_bar.setValue(0)
         self.status_label.setText("Screening...")
-        self.table.setRowCount(0)
+        self._model.set_results([])
         self.results.clear()
 
         screener = SurfaceScreener(
@@ -203,42 +266,7 @@ class ScreeningDialog(QDialog):
         QMessageBox.critical(self, "Screening Error", error_msg)
 
     def _populate_table(self, results):
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(len(results))
-
-        for row, r in enumerate(results):
-            # Store original index in first column's UserRole so sorting
-            # doesn't break the mapping between visual row and results list
-            miller_item = QTableWidgetItem(r["miller_str"])
-            miller_item.setData(Qt.UserRole, row)
-            self.table.setItem(row, 0, miller_item)
-
-            # Use numeric sort items for columns that should sort numerically
-            shift_item = QTableWidgetItem()
-            shift_item.setData(Qt.DisplayRole, float(round(r["shift"], 4)))
-            self.table.setItem(row, 1, shift_item)
-
-            atoms_item = QTableWidgetItem()
-            atoms_item.setData(Qt.DisplayRole, int(r["num_atoms"]))
-            self.table.setItem(row, 2, atoms_item)
-
-            area_item = QTableWidgetItem()
-            area_item.setData(Qt.DisplayRole, float(round(r["surface_area"], 2)))
-            self.table.setItem(row, 3, area_item)
-
-            sym_text = "Yes" if r["is_symmetric"] else ("No" if r["is_symmetric"] is not None else "N/A")
-            sym_item = QTableWidgetItem(sym_text)
-            if r["is_symmetric"] is True:
-                sym_item.setBackground(QColor(200, 255, 200))
-                sym_item.setForeground(QColor(0, 80, 0))
-            elif r["is_symmetric"] is False:
-                sym_item.setBackground(QColor(255, 255, 200))
-                sym_item.setForeground(QColor(120, 100, 0))
-            self.table.setItem(row, 4, sym_item)
-
-            self.table.setItem(row, 5, QTableWidgetItem(r["formula"]))
-
-        self.table.setSortingEnabled(True)
+        self._model.set_results(results)
 
     def _export_csv(self):
         path, _ = QFileDialog.getSaveFileName(
@@ -248,17 +276,21 @@ class ScreeningDialog(QDialog):
         if not path:
             return
 
+        # Format the whole table in memory, then write it in one call
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow([
+            "Miller Index", "Shift", "Atoms",
+            "Surface Area (A^2)", "Symmetric", "Formula"
+        ])
+        writer.writerows(
+            (r["miller_str"], r["shift"], r["num_atoms"],
+             r["surface_area"], r["is_symmetric"], r["formula"])
+            for r in self.results
+        )
+
         with open(path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "Miller Index", "Shift", "Atoms",
-                "Surface Area (A^2)", "Symmetric", "Formula"
-            ])
-            for r in self.results:
-                writer.writerow([
-                    r["miller_str"], r["shift"], r["num_atoms"],
-                    r["surface_area"], r["is_symmetric"], r["formula"]
-                ])
+            f.write(buf.getvalue())
 
         QMessageBox.information(self, "Exported", f"Results saved to:\n{path}")
 
@@ -272,30 +304,51 @@ class ScreeningDialog(QDialog):
         if not output_dir:
             return
 
-        exported = []
-        for r in self.results:
-            h, k, l = r["miller"]
-            shift = r["shift"]
-            fname = f"POSCAR_{h}-{k}-{l}_shift{shift}.vasp".replace(".", "-") + ""
-            # Clean up double extensions from replace
-            fname = f"POSCAR_{h}{k}{l}_shift{str(shift).replace('.', '-')}.vasp"
-            fpath = os.path.join(output_dir, fname)
-            Poscar(r["slab"]).write_file(fpath)
-            exported.append(fname)
+        jobs = [
+            (os.path.join(output_dir, r["fname_stem"] + ".vasp"), r["slab"], "poscar")
+            for r in self.results
+        ]
+
+        self.export_poscar_button.setEnabled(False)
+        self.run_button.setEnabled(False)
+        self.progress_bar.setMaximum(len(jobs))
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Exporting POSCAR files...")
+
+        self._export_worker = ExportWorker(jobs)
+        self._export_worker.progress.connect(self._on_export_progress)
+        self._export_worker.finished.connect(
+            lambda count: self._on_export_finished(count, output_dir))
+        self._export_worker.error.connect(self._on_export_error)
+        self._export_worker.start()
+
+    def _on_export_progress(self, current, total):
+        self.progress_bar.setValue(current)
+        self.status_label.setText(f"Exporting POSCAR files {current}/{total}...")
 
+    def _on_export_finished(self, count, output_dir):
+        self.export_poscar_button.setEnabled(True)
+        self.run_button.setEnabled(True)
+        self.status_label.setText(f"Exported {count} POSCAR files.")
         QMessageBox.information(
             self, "Export Complete",
-            f"Exported {len(exported)} POSCAR files to:\n{output_dir}")
+            f"Exported {count} POSCAR files to:\n{output_dir}")
+
+    def _on_export_error(self, error_msg):
+        self.export_poscar_button.setEnabled(True)
+        self.run_button.setEnabled(True)
+        self.status_label.setText("Export failed.")
+        QMessageBox.critical(self, "Export Error", error_msg)
 
     def _get_original_index(self, visual_row):
         """Map a visual table row back to the original results list index."""
-        item = self.table.item(visual_row, 0)
-        if item is None:
+        index = self._proxy.index(visual_row, 0)
+        if not index.isValid():
             return -1
-        return item.data(Qt.UserRole)
+        return self._proxy.mapToSource(index).row()
 
     def _load_selected(self):
-        visual_row = self.table.currentRow()
+        visual_row = self.table.currentIndex().row()
         if visual_row < 0:
             QMessageBox.warning(self, "Error", "No surface selected.")
             return
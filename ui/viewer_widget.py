@@ -35,14 +35,21 @@ class StructureViewer(QWidget):
         self.ax.text2D(0.5, 0.5, "No structure loaded",
                        transform=self.ax.transAxes,
                        ha="center", va="center", fontsize=11, color="gray")
+        self.fig.tight_layout()
         self.canvas.draw()
 
+    def resizeEvent(self, event):
+        # Layout only depends on the figure size, so recompute it here
+        # rather than on every structure update.
+        super().resizeEvent(event)
+        self.fig.tight_layout()
+        self.canvas.draw_idle()
+
     def update_structure(self, structure):
         """Update the 3D view with a new structure."""
         self._current_structure = structure
         plot_structure_3d(self.ax, structure)
-        self.fig.tight_layout()
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     def clear(self):
         """Clear the viewer."""
@@ -54,4 +61,4 @@ class StructureViewer(QWidget):
         self.ax.text2D(0.5, 0.5, "No structure loaded",
                        transform=self.ax.transAxes,
                        ha="center", va="center", fontsize=11, color="gray")
-        self.canvas.draw()
+        self.canvas.draw_idle()
@@ -0,0 +1,36 @@
+from PySide6.QtCore import QThread, Signal
+
+
+def _write_poscar(structure, path):
+    """Write a structure as a POSCAR file, formatted by pymatgen in one write."""
+    from pymatgen.io.vasp.inputs import Poscar
+
+    data = Poscar(structure).get_str()
+    with open(path, "w") as f:
+        f.write(data)
+
+
+class ExportWorker(QThread):
+    """Background worker that writes slab files to disk."""
+    progress = Signal(int, int)  # files written, total
+    finished = Signal(int)       # number of files written
+    error = Signal(str)
+
+    def __init__(self, jobs):
+        super().__init__()
+        self.jobs = jobs  # (path, structure, "cif" | "poscar")
+
+    def run(self):
+        try:
+            total = len(self.jobs)
+            for i, (path, structure, fmt) in enumerate(self.jobs, 1):
+                if fmt == "cif":
+                    from pymatgen.io.cif import CifWriter
+
+                    CifWriter(structure).write_file(path)
+                else:
+                    _write_poscar(structure, path)
+                self.progress.emit(i, total)
+            self.finished.emit(len(self.jobs))
+        except Exception as e:
+            self.error.emit(str(e))